@@ -1,10 +1,8 @@
-import json
 import datetime
 from typing import Dict, List
 
-import requests
-
 from Bot.log import logging_decor, logging_decor_cls
+from Bot.botrequests.transport import Transport, get_transport
 
 
 @logging_decor_cls
@@ -118,7 +116,7 @@ class City:
         self._min_max_distance = min_max_distance
 
     @logging_decor
-    def search_all_id_for_name(self, URL_BASIC: str, HEADERS: Dict) -> Dict:
+    def search_all_id_for_name(self, URL_BASIC: str, HEADERS: Dict, transport: Transport = None) -> Dict:
         """
         Создает запрос на API Hotels по имени города. Полученные данные записывает в словарь:
         key - идентификатор города, value - название города и страна
@@ -130,16 +128,20 @@ class City:
         :param HEADERS:
         :type HEADERS: Dict
 
+        :param transport: транспорт для запросов, по умолчанию get_transport()
+        :type transport: Transport
+
         :return: cities
         :rtype: Dict
         """
 
+        if transport is None:
+            transport = get_transport()
         cities = dict()
         url = URL_BASIC + "locations/search"
         querystring = {"query": self._name, "locale": self._lang}
 
-        response = requests.request("GET", url, headers=HEADERS, params=querystring)
-        data = json.loads(response.text)
+        data = transport.get_json(url, HEADERS, querystring)
         for i_elem in data["suggestions"][0]["entities"]:
             if i_elem.get("type") == "CITY" and i_elem.get("name") == self._name.title():
                 city_id = i_elem.get("destinationId")
@@ -148,7 +150,7 @@ class City:
         return cities
 
     @logging_decor
-    def search_hotels(self, URL_BASIC: str, HEADERS: Dict) -> List:
+    def search_hotels(self, URL_BASIC: str, HEADERS: Dict, transport: Transport = None) -> List:
         """
         Создает запрос на API Hotels для поиска отелей в указанном городе.
         Возвращает список словарей с информацией об отелях.
@@ -159,10 +161,15 @@ class City:
         :param HEADERS:
         :type HEADERS: Dict
 
+        :param transport: транспорт для запросов, по умолчанию get_transport()
+        :type transport: Transport
+
         :return: hotels
         :rtype: List
         """
 
+        if transport is None:
+            transport = get_transport()
         url = URL_BASIC + "properties/list"
         check_in = datetime.datetime.now().strftime("%Y-%m-%d")
         check_out = (datetime.datetime.now() + datetime.timedelta(days=1)).strftime("%Y-%m-%d")
@@ -171,8 +178,7 @@ class City:
                            "pageSize": self._total_hotels, "checkOut": check_out, "checkIn": check_in,
                            "sortOrder": self._sort_order, "locale": self._lang, "currency": "RUB"}
 
-            response = requests.request("GET", url, headers=HEADERS, params=querystring)
-            hotels = json.loads(response.text)
+            hotels = transport.get_json(url, HEADERS, querystring)
             return hotels.get("data", {}).get("body", {}).get("searchResults", {}).get("results", '')
 
         else:
@@ -187,8 +193,7 @@ class City:
                                "pageSize": 25, "checkOut": check_out, "checkIn": check_in,
                                "priceMax": max(self._min_max_price), "sortOrder": self._sort_order,
                                "locale": self._lang, "currency": "RUB", "priceMin": min(self._min_max_price)}
-                response = requests.request("GET", url, headers=HEADERS, params=querystring)
-                interim_hotels = json.loads(response.text)
+                interim_hotels = transport.get_json(url, HEADERS, querystring)
 
                 for i_hotels in interim_hotels.get("data", {}).get("body", {}).get("searchResults", {}).get("results", ''):
                     distance = i_hotels["landmarks"][0]["distance"].replace(',', '.').split()[0]
@@ -1,9 +1,9 @@
 from typing import Dict
 
-from emoji import emojize
-
 from Bot.log import logging_decor_cls
 
+STAR: str = "\u2b50"
+
 
 @logging_decor_cls
 class Hotel:
@@ -38,7 +38,7 @@ class Hotel:
     def __str__(self) -> str:
         return "*{name}*\n{stars}\n{address}\nРасстояние до центра: {distance}\n " \
                "Рейтинг: *{rating} {rating_text}*\nЦена за 1 ночь: *{price}*".format(
-                                                                                stars=emojize(":star:") * self._stars,
+                                                                                stars=STAR * self._stars,
                                                                                 name=self._name,
                                                                                 address=self._address,
                                                                                 distance=self._distance,
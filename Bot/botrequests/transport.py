@@ -0,0 +1,317 @@
+import atexit
+import gzip
+import json
+import os
+import signal
+import tempfile
+import threading
+from typing import Any, Dict, Optional, Tuple, Union
+from urllib.parse import urlencode
+
+SECRET_HEADERS: Tuple[str, ...] = ("x-rapidapi-key",)
+VOLATILE_PARAMS: Tuple[str, ...] = ("checkIn", "checkOut")
+CASSETTE_VERSION: int = 1
+
+
+class CassetteMissError(KeyError):
+    """
+    Исключение: в кассете нет записанного ответа на запрос.
+    Наследуется от KeyError, чтобы обработчики бота реагировали на промах так же, как на отсутствие данных.
+    """
+
+
+def normalize_query(method: str, url: str, params: Optional[Dict] = None) -> str:
+    """
+    Строит ключ запроса для индекса кассеты: метод, url и отсортированные параметры.
+    Значения параметров приводятся к строке и экранируются (urlencode), даты заезда и выезда не учитываются,
+    поэтому записанный сегодня ответ находится и при воспроизведении в другой день.
+
+    :param method:
+    :type method: str
+
+    :param url:
+    :type url: str
+
+    :param params:
+    :type params: Dict
+
+    :return: key
+    :rtype: str
+    """
+    items = sorted((str(i_key), str(i_value)) for i_key, i_value in (params or {}).items()
+                   if i_key not in VOLATILE_PARAMS)
+    query = urlencode(items)
+    return "{method} {url}?{query}".format(method=method.upper(), url=url, query=query)
+
+
+def strip_headers(headers: Optional[Dict]) -> Dict:
+    """
+    Возвращает копию заголовков без секретных (ключ API не попадает в кассету).
+    """
+    return {i_key: i_value for i_key, i_value in (headers or {}).items() if i_key.lower() not in SECRET_HEADERS}
+
+
+class HttpTransport:
+    """
+    Транспорт для запросов к API Hotels через requests.
+    """
+
+    def fetch(self, url: str, headers: Dict, params: Dict) -> Tuple[int, Any]:
+        """
+        Выполняет GET запрос и возвращает код ответа и разобранный JSON ответа.
+        """
+        import requests
+
+        response = requests.request("GET", url, headers=headers, params=params)
+        return response.status_code, json.loads(response.text)
+
+    def get_json(self, url: str, headers: Dict, params: Dict) -> Any:
+        """
+        Выполняет GET запрос и возвращает разобранный JSON ответа.
+        """
+        return self.fetch(url, headers, params)[1]
+
+
+class Cassette:
+    """
+    Кассета с записанными парами запрос/ответ API Hotels
+
+    Хранится в файле как JSON, сжатый gzip. Ответы индексируются по нормализованному запросу (normalize_query).
+    Запись и сохранение защищены блокировкой: TeleBot обрабатывает сообщения в нескольких потоках.
+    Для каждого ответа хранится его JSON строка: lookup разбирает ее заново, поэтому изменения в полученном
+    объекте не попадают ни в следующие ответы, ни в файл кассеты.
+
+    Args:
+        path (str): передается путь к файлу кассеты
+
+    Attributes:
+        _path (str): путь к файлу кассеты
+        _interactions (Dict): записи кассеты, ключ - нормализованный запрос
+        _bodies (Dict[str, str]): JSON строки ответов, ключ - нормализованный запрос
+        _lock (threading.RLock): блокировка для записи и сохранения (повторно входимая, так как save
+                                 может вызвать обработчик SIGTERM в потоке, который уже держит блокировку)
+    """
+
+    def __init__(self, path: str) -> None:
+        self._path = path
+        self._interactions = dict()
+        self._bodies = dict()
+        self._lock = threading.RLock()
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def interactions(self) -> Dict:
+        return self._interactions
+
+    def __len__(self) -> int:
+        return len(self._interactions)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._interactions
+
+    def load(self) -> "Cassette":
+        """
+        Загружает кассету из файла. Если файла нет, кассета остается пустой.
+        """
+        if os.path.exists(self._path):
+            with gzip.open(self._path, "rt", encoding="utf-8") as file:
+                data = json.load(file)
+            if data.get("version") != CASSETTE_VERSION:
+                raise ValueError("Неподдерживаемая версия кассеты: {version}".format(version=data.get("version")))
+            self._interactions = data.get("interactions", {})
+            self._bodies = {i_key: json.dumps(i_value["response"]) for i_key, i_value in self._interactions.items()}
+        return self
+
+    def save(self) -> None:
+        """
+        Сохраняет кассету в файл.
+        Кассета пишется во временный файл в том же каталоге и затем заменяет старую (os.replace),
+        поэтому прерванное сохранение не оставляет поврежденный файл.
+        """
+        directory = os.path.dirname(self._path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            descriptor, temp_path = tempfile.mkstemp(dir=directory or None, prefix=os.path.basename(self._path),
+                                                     suffix=".tmp")
+            try:
+                with os.fdopen(descriptor, "wb") as raw_file, \
+                        gzip.open(raw_file, "wt", encoding="utf-8") as file:
+                    json.dump({"version": CASSETTE_VERSION, "interactions": self._interactions}, file,
+                              ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+                os.replace(temp_path, self._path)
+            except BaseException:
+                os.remove(temp_path)
+                raise
+
+    def record(self, url: str, headers: Dict, params: Dict, body: Any, status: int = 200) -> None:
+        """
+        Добавляет в кассету запрос (без секретных заголовков) и ответ на него.
+        В кассету попадает копия ответа, поэтому дальнейшие изменения body ее не затрагивают.
+        """
+        key = normalize_query("GET", url, params)
+        text = json.dumps(body)
+        interaction = {
+            "request": {"method": "GET", "url": url, "headers": strip_headers(headers),
+                        "params": {i_key: str(i_value) for i_key, i_value in params.items()}},
+            "status": status,
+            "response": json.loads(text)
+        }
+        with self._lock:
+            self._interactions[key] = interaction
+            self._bodies[key] = text
+
+    def lookup(self, url: str, params: Dict) -> Any:
+        """
+        Возвращает новую копию записанного ответа на запрос.
+        Если запроса нет в кассете, выбрасывает CassetteMissError.
+        """
+        key = normalize_query("GET", url, params)
+        try:
+            return json.loads(self._bodies[key])
+        except KeyError:
+            raise CassetteMissError("Запрос отсутствует в кассете {path}: {key}".format(path=self._path, key=key))
+
+
+class RecordingTransport:
+    """
+    Транспорт, который выполняет запросы через другой транспорт и записывает ответы в кассету.
+    Записываются только успешные ответы (код 2xx): ошибки API (401, 429, 5xx) не попадают в кассету
+    и не заменяют уже записанный ответ.
+    Кассета сохраняется в файл методом close (make_transport вызывает его при завершении процесса и по SIGTERM).
+
+    Args:
+        cassette (Cassette): передается кассета для записи
+        transport (HttpTransport): передается транспорт для реальных запросов (с методом fetch)
+
+    Attributes:
+        _cassette (Cassette): кассета для записи
+        _transport (HttpTransport): транспорт для реальных запросов
+    """
+
+    def __init__(self, cassette: Cassette, transport: HttpTransport = None) -> None:
+        if transport is None:
+            transport = HttpTransport()
+        self._cassette = cassette
+        self._transport = transport
+
+    @property
+    def cassette(self) -> Cassette:
+        return self._cassette
+
+    def get_json(self, url: str, headers: Dict, params: Dict) -> Any:
+        """
+        Выполняет запрос и записывает успешный ответ в кассету.
+        """
+        status, body = self._transport.fetch(url, headers, params)
+        if 200 <= status < 300:
+            self._cassette.record(url, headers, params, body, status)
+        return body
+
+    def close(self) -> None:
+        """
+        Сохраняет кассету в файл.
+        """
+        self._cassette.save()
+
+
+class ReplayTransport:
+    """
+    Транспорт, который отвечает на запросы из кассеты без обращения к сети.
+    Каждый ответ разбирается из JSON строки заново, как при реальном запросе: повторные запросы
+    отдают новые объекты, и изменения в них не влияют на кассету.
+
+    Args:
+        cassette (Cassette): передается кассета с записанными ответами
+
+    Attributes:
+        _cassette (Cassette): кассета с записанными ответами
+    """
+
+    def __init__(self, cassette: Cassette) -> None:
+        self._cassette = cassette
+
+    @property
+    def cassette(self) -> Cassette:
+        return self._cassette
+
+    def get_json(self, url: str, headers: Dict, params: Dict) -> Any:
+        """
+        Возвращает записанный ответ на запрос.
+        """
+        return self._cassette.lookup(url, params)
+
+
+Transport = Union[HttpTransport, RecordingTransport, ReplayTransport]
+
+_transport: Optional[Transport] = None
+
+
+def get_transport() -> Transport:
+    """
+    Возвращает транспорт по умолчанию. Если он не задан через set_transport, создается HttpTransport.
+    """
+    global _transport
+    if _transport is None:
+        _transport = HttpTransport()
+    return _transport
+
+
+def set_transport(transport: Transport) -> None:
+    """
+    Задает транспорт по умолчанию для запросов класса City.
+    """
+    global _transport
+    _transport = transport
+
+
+def close_on_sigterm(transport: RecordingTransport) -> None:
+    """
+    Сохраняет кассету при получении SIGTERM (остановка контейнера или службы), при котором atexit не вызывается.
+    После сохранения вызывается прежний обработчик сигнала, а если его нет - процесс завершается.
+    Обработчик можно установить только из главного потока.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return
+    previous = signal.getsignal(signal.SIGTERM)
+
+    def handler(signum, frame) -> None:
+        transport.close()
+        if callable(previous):
+            previous(signum, frame)
+        elif previous != signal.SIG_IGN:
+            raise SystemExit(128 + signum)
+
+    signal.signal(signal.SIGTERM, handler)
+
+
+def make_transport(mode: str = "live", cassette_path: str = None) -> Transport:
+    """
+    Создает транспорт по режиму работы: live - реальные запросы, record - запросы с записью в кассету,
+    replay - ответы из кассеты без сети.
+
+    :param mode:
+    :type mode: str
+
+    :param cassette_path:
+    :type cassette_path: str
+
+    :return: transport
+    :rtype: Transport
+    """
+    if mode == "live":
+        return HttpTransport()
+    if mode not in ("record", "replay"):
+        raise ValueError("Неизвестный режим транспорта: {mode}".format(mode=mode))
+    if not cassette_path:
+        raise ValueError("Для режима {mode} нужен путь к кассете".format(mode=mode))
+    cassette = Cassette(cassette_path).load()
+    if mode == "record":
+        transport = RecordingTransport(cassette)
+        atexit.register(transport.close)
+        close_on_sigterm(transport)
+        return transport
+    return ReplayTransport(cassette)
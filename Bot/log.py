@@ -1,11 +1,26 @@
 import os
 import functools
-from typing import Callable
+import threading
+from typing import Callable, Optional
 
 from loguru import logger
 
 path_log: str = os.sep.join(("logs", "logging_{time}.log"))
-logger.add(path_log, format="{time} | {level}   | {message}", level="DEBUG", encoding="utf-8")
+_sink_id: Optional[int] = None
+_sink_lock = threading.Lock()
+
+
+def setup_logging() -> None:
+    """
+    Функция создает файл для записи логов при первом обращении.
+    Повторные вызовы ничего не делают, поэтому файл не создается при импорте модуля.
+    Проверка защищена блокировкой: функцию могут одновременно вызвать обработчики TeleBot из разных потоков.
+    """
+    global _sink_id
+    with _sink_lock:
+        if _sink_id is None:
+            _sink_id = logger.add(path_log, format="{time} | {level}   | {message}", level="DEBUG",
+                                  encoding="utf-8")
 
 
 def logging_decor(func: Callable) -> Callable:
@@ -16,6 +31,7 @@ def logging_decor(func: Callable) -> Callable:
 
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
+        setup_logging()
         logger.debug("Вызвана функция: {func}, аргументы: {args}, {kwargs}".format(func=func.__name__,
                                                                                    args=args, kwargs=kwargs))
         if args:
@@ -39,6 +55,7 @@ def logging_decor_cls(cls):
 
     @functools.wraps(cls)
     def wrapper(*args, **kwargs):
+        setup_logging()
         logger.debug("Создан инстанс класса: {cls}, аргументы: {args}, {kwargs}".format(cls=cls.__name__,
                                                                                         args=args, kwargs=kwargs))
         instance = cls(*args, **kwargs)
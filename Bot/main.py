@@ -1,31 +1,68 @@
 import re
-from typing import Dict
+import argparse
+from typing import Dict, List, Optional, TYPE_CHECKING
 
-import telebot
-from decouple import config
 from loguru import logger
-from telebot import types
 
-from log import logging_decor
+from log import logging_decor, setup_logging
 from botrequests.city_class import City
 from botrequests.hotel_class import Hotel
+# Импорт через пакет Bot, как в botrequests.city_class: иначе модуль transport загрузится второй раз под другим
+# именем, set_transport не повлияет на City, а except CassetteMissError не поймает исключение из City.
+from Bot.botrequests.transport import CassetteMissError, make_transport, set_transport
+# botrequests импортирует log как Bot.log, это отдельный от log модуль со своим файлом логов.
+from Bot.log import setup_logging as setup_package_logging
 
+if TYPE_CHECKING:
+    import telebot
+    from telebot import types
 
-TOKEN: str = config("TOKEN")
-KEY: str = config("KEY")
 
-bot = telebot.TeleBot(TOKEN)
+bot: Optional["telebot.TeleBot"] = None
 
 COMPANY: str = '"Too Easy Travel"'
 URL_BASIC: str = "https://hotels4.p.rapidapi.com/"
 HEADERS: Dict = {
-    'x-rapidapi-key': KEY,
     'x-rapidapi-host': "hotels4.p.rapidapi.com"
 }
 
 user_requests: Dict = {}
 
 
+def create_bot(token: str = None, key: str = None) -> "telebot.TeleBot":
+    """
+    Фабрика приложения.
+
+    Импортирует telebot и decouple, читает TOKEN и KEY из конфигурации (если они не переданы явно),
+    создает инстанс TeleBot и регистрирует обработчики. До вызова фабрики модуль можно импортировать
+    без сети, конфигурации и файла логов.
+    Режим запросов к API Hotels задается переменной HOTELS_MODE (live, record, replay), путь к кассете -
+    переменной HOTELS_CASSETTE. В режиме replay KEY не обязателен.
+    """
+    global bot
+    import telebot
+    from decouple import config
+
+    setup_logging()
+    setup_package_logging()
+    mode = config("HOTELS_MODE", default="live")
+    if token is None:
+        token = config("TOKEN")
+    if key is None:
+        key = config("KEY", default="") if mode == "replay" else config("KEY")
+    set_transport(make_transport(mode, config("HOTELS_CASSETTE", default=None)))
+    HEADERS['x-rapidapi-key'] = key
+
+    bot = telebot.TeleBot(token)
+    bot.message_handler(commands=['hello_world'])(hello_world)
+    bot.message_handler(commands=['start'])(start_message)
+    bot.message_handler(commands=['help'])(help_message)
+    bot.message_handler(commands=['lowprice', 'highprice', 'bestdeal'])(commands)
+    bot.callback_query_handler(func=lambda call: True)(callback_worker)
+    bot.message_handler(content_types=['text'])(say_hello)
+    return bot
+
+
 @logging_decor
 def new_user(chat_id: int) -> None:
     """
@@ -37,9 +74,8 @@ def new_user(chat_id: int) -> None:
         logger.info("Новый пользователь добавлен в список, ID чата: {chat_id}".format(chat_id=chat_id))
 
 
-@bot.message_handler(commands=['hello_world'])
 @logging_decor
-def hello_world(message: types.Message) -> None:
+def hello_world(message: "types.Message") -> None:
     """
     Функция обрабатывает команду /hello_world.
     Сначала вызывает функцию new_user, которая проверяет наличие id чата в
@@ -50,9 +86,8 @@ def hello_world(message: types.Message) -> None:
     bot.send_message(message.from_user.id, "Привет Мир!")
 
 
-@bot.message_handler(commands=['start'])
 @logging_decor
-def start_message(message: types.Message) -> None:
+def start_message(message: "types.Message") -> None:
     """
     Функция обрабатывает команду /start.
     Сначала вызывает функцию new_user, которая проверяет наличие id чата в
@@ -68,9 +103,8 @@ def start_message(message: types.Message) -> None:
                                                            name=COMPANY))
 
 
-@bot.message_handler(commands=['help'])
 @logging_decor
-def help_message(message: types.Message) -> None:
+def help_message(message: "types.Message") -> None:
     """
     Функция обрабатывает команду /help.
     Сначала вызывает функцию new_user, которая проверяет наличие id чата в
@@ -86,10 +120,9 @@ def help_message(message: types.Message) -> None:
                                            "центру)".format(name=COMPANY))
 
 
-@bot.message_handler(commands=['lowprice', 'highprice', 'bestdeal'])
 @logging_decor
 @logger.catch
-def commands(message: types.Message) -> None:
+def commands(message: "types.Message") -> None:
     """
     Функция обрабатывает запросы пользователя /lowprice, /highprice и /bestdeal.
     Сначала вызывает функцию new_user, которая проверяет наличие id чата в
@@ -107,7 +140,7 @@ def commands(message: types.Message) -> None:
 
 @logging_decor
 @logger.catch
-def query_city(message: types.Message) -> None:
+def query_city(message: "types.Message") -> None:
     """
     Запрашивает у пользователя город для поиска.
     """
@@ -117,7 +150,7 @@ def query_city(message: types.Message) -> None:
 
 @logging_decor
 @logger.catch
-def search_for_city(message: types.Message) -> None:
+def search_for_city(message: "types.Message") -> None:
     """
     Поиск города
 
@@ -128,6 +161,8 @@ def search_for_city(message: types.Message) -> None:
     исключение и пользователю сообщается, что такого города нет в БД.
     """
 
+    from telebot import types
+
     user_requests[message.chat.id].name = message.text
     if not re.match(r"\b[а-я]\w*", message.text, flags=re.IGNORECASE):
         user_requests[message.chat.id].lang = "en_US"
@@ -145,16 +180,17 @@ def search_for_city(message: types.Message) -> None:
             else:
                 user_requests[message.chat.id].city_id = [i_id for i_id in cities_list][0]
                 query_total_hotels(message)
-    except KeyError:
+    except KeyError as exc:
+        if isinstance(exc, CassetteMissError):
+            logger.error(exc)
         logger.error("Город отсутствует в базе данных: {val}".format(val=message.text))
         bot.send_message(message.chat.id, "В моей базе нет такого города.")
         query_city(message)
 
 
-@bot.callback_query_handler(func=lambda call: True)
 @logging_decor
 @logger.catch
-def callback_worker(call: types.CallbackQuery) -> None:
+def callback_worker(call: "types.CallbackQuery") -> None:
     """
     Обработчик Inline клавиатуры.
     Принимает на вход значение callback_data и присваивает его переменной city_id инстанса класса City.
@@ -169,7 +205,7 @@ def callback_worker(call: types.CallbackQuery) -> None:
 
 @logging_decor
 @logger.catch
-def query_total_hotels(message: types.Message) -> None:
+def query_total_hotels(message: "types.Message") -> None:
     """
     Функция запрашивает у пользователя какое количество отелей необходимо отобразить.
     """
@@ -179,7 +215,7 @@ def query_total_hotels(message: types.Message) -> None:
 
 @logging_decor
 @logger.catch
-def check_errors_in_total_hotels(message: types.Message) -> None:
+def check_errors_in_total_hotels(message: "types.Message") -> None:
     """
     Функция обрабатывает ошибки, связанные с некорректным вводом количества отелей пользователем
 
@@ -213,7 +249,7 @@ def check_errors_in_total_hotels(message: types.Message) -> None:
 
 @logging_decor
 @logger.catch
-def query_min_max_price(message: types.Message) -> None:
+def query_min_max_price(message: "types.Message") -> None:
     """
     Запрашивает минимальную и максимальную стоимость отеля.
     """
@@ -252,7 +288,7 @@ def check_errors_in_min_max_price(message):
 
 @logging_decor
 @logger.catch
-def query_distance(message: types.Message) -> None:
+def query_distance(message: "types.Message") -> None:
     """
     Запрашивает минимальное и максимальное расстояние от отеля до центра.
     """
@@ -270,7 +306,7 @@ def query_distance(message: types.Message) -> None:
 
 @logging_decor
 @logger.catch
-def check_errors_in_min_max_distance(message: types.Message) -> None:
+def check_errors_in_min_max_distance(message: "types.Message") -> None:
     """
     Функция обрабатывает ошибки, связанные с некорректным вводом расстояния пользователем
 
@@ -291,18 +327,22 @@ def check_errors_in_min_max_distance(message: types.Message) -> None:
 
 @logging_decor
 @logger.catch
-def choice_hotels(message: types.Message) -> None:
+def choice_hotels(message: "types.Message") -> None:
     """
     Подбор отелей по параметрам пользователя
 
     Вызывается метод класса City для подбора отелей, который возвращает список словарей с информацией по отелям.
     Из каждого объекта списка создается инстанс класса Hotel и добавляется в hotels класса City.
-    Если возвращается пустой список, то выбрасывается исключение и пользователю сообщается, что по заданным параметрам
-    отелей не найдено.
+    Если возвращается пустой список (или в режиме replay запроса нет в кассете), то выбрасывается исключение и
+    пользователю сообщается, что по заданным параметрам отелей не найдено.
 
     """
     bot.send_message(message.chat.id, "Подбираю отели. Ожидайте...")
-    hotels = user_requests[message.chat.id].search_hotels(URL_BASIC=URL_BASIC, HEADERS=HEADERS)
+    try:
+        hotels = user_requests[message.chat.id].search_hotels(URL_BASIC=URL_BASIC, HEADERS=HEADERS)
+    except CassetteMissError as exc:
+        logger.error(exc)
+        hotels = []
     for i_hotel in hotels:
         user_requests[message.chat.id].hotels.append(Hotel(all_info=i_hotel))
     try:
@@ -319,7 +359,7 @@ def choice_hotels(message: types.Message) -> None:
 
 @logging_decor
 @logger.catch
-def get_info(message: types.Message) -> None:
+def get_info(message: "types.Message") -> None:
     """
     Передает информацию об отелях пользователю
     Из списка объектов класса Hotel формирует инфо и выдает в телеграмм пользователю.
@@ -330,9 +370,8 @@ def get_info(message: types.Message) -> None:
     user_requests.pop(message.chat.id)
 
 
-@bot.message_handler(content_types=['text'])
 @logging_decor
-def say_hello(message: types.Message) -> None:
+def say_hello(message: "types.Message") -> None:
     """
     Функция обрабатывает сообщения от пользователя (Привет, Спасибо) и
     отвечает на них соответствующей фразой
@@ -348,5 +387,28 @@ def say_hello(message: types.Message) -> None:
         bot.send_message(message.chat.id, "Я Вас не понимаю.\nЕсли хотите узнать, что я умею нажмите /help.")
 
 
+def main(argv: List[str] = None) -> None:
+    """
+    Точка входа. Без аргументов запускает бота, с --profile-imports выводит профиль импорта модулей,
+    с --benchmark замеряет время холодного старта.
+    """
+    parser = argparse.ArgumentParser(description="Телеграм-бот {name}".format(name=COMPANY))
+    parser.add_argument("--profile-imports", action="store_true", help="вывести профиль импорта модулей")
+    parser.add_argument("--benchmark", action="store_true", help="замерить время холодного старта")
+    parser.add_argument("--runs", type=int, default=5, help="количество запусков для --benchmark")
+    args = parser.parse_args(argv)
+
+    if args.profile_imports or args.benchmark:
+        import startup
+
+        if args.profile_imports:
+            startup.print_import_profile()
+        if args.benchmark:
+            startup.print_startup_benchmark(runs=args.runs)
+        return
+
+    create_bot().polling(none_stop=True, interval=0)
+
+
 if __name__ == '__main__':
-    bot.polling(none_stop=True, interval=0)
+    main()
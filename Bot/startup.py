@@ -0,0 +1,100 @@
+import os
+import sys
+import time
+import statistics
+import subprocess
+import tempfile
+from typing import Dict, List, Tuple
+
+BOT_DIR: str = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR: str = os.path.dirname(BOT_DIR)
+
+IMPORT_CODE: str = "import {module}"
+FACTORY_CODE: str = "import {module}; {module}.create_bot(token='x', key='x')"
+
+
+def _run_code(code: str, *options: str) -> subprocess.CompletedProcess:
+    """
+    Запускает новый интерпретатор с переданным кодом.
+    Каталоги Bot и корень репозитория добавляются в PYTHONPATH, чтобы работали оба вида импорта log.
+    Рабочий каталог временный, чтобы файлы логов не оставались после замера.
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, (BOT_DIR, ROOT_DIR, env.get("PYTHONPATH"))))
+    with tempfile.TemporaryDirectory() as work_dir:
+        return subprocess.run([sys.executable, *options, "-c", code],
+                              cwd=work_dir, env=env, capture_output=True, text=True, check=True)
+
+
+def import_profile(module: str = "main") -> List[Tuple[str, int]]:
+    """
+    Профиль импорта модуля, построенный по выводу 'python -X importtime'.
+    Собственное время импорта каждого модуля суммируется по пакету верхнего уровня (telebot, loguru, requests...).
+    Возвращает список пар (пакет, время импорта в мкс), отсортированный по убыванию.
+
+    :param module:
+    :type module: str
+
+    :return: profile
+    :rtype: List[Tuple[str, int]]
+    """
+    result = _run_code(IMPORT_CODE.format(module=module), "-X", "importtime")
+    totals: Dict[str, int] = dict()
+    for i_line in result.stderr.splitlines():
+        if not i_line.startswith("import time:") or "cumulative" in i_line:
+            continue
+        self_time, _, name = i_line[len("import time:"):].split("|")
+        name = name.strip().split(".")[0]
+        totals[name] = totals.get(name, 0) + int(self_time)
+    return sorted(totals.items(), key=lambda x: x[1], reverse=True)
+
+
+def startup_benchmark(module: str = "main", runs: int = 5, code: str = IMPORT_CODE) -> Dict[str, float]:
+    """
+    Замеряет время холодного старта: сколько занимает запуск интерпретатора с кодом code.
+    По умолчанию только импортирует модуль бота, с FACTORY_CODE еще и вызывает create_bot,
+    то есть проходит весь путь, который рабочий процесс проходит до polling.
+    Возвращает словарь с минимальным, медианным и максимальным временем в мс.
+
+    :param module:
+    :type module: str
+
+    :param runs:
+    :type runs: int
+
+    :param code:
+    :type code: str
+
+    :return: timings
+    :rtype: Dict[str, float]
+    """
+    timings = list()
+    for _ in range(max(runs, 1)):
+        start = time.perf_counter()
+        _run_code(code.format(module=module))
+        timings.append((time.perf_counter() - start) * 1000)
+    return {"min": min(timings), "median": statistics.median(timings), "max": max(timings)}
+
+
+def print_import_profile(module: str = "main", limit: int = 15) -> None:
+    """
+    Выводит профиль импорта модуля: пакеты, импорт которых занимает больше всего времени.
+    """
+    print("Профиль импорта {module} (мкс):".format(module=module))
+    for i_name, i_time in import_profile(module)[:limit]:
+        print("{time:>10}  {name}".format(time=i_time, name=i_name))
+
+
+def print_startup_benchmark(module: str = "main", runs: int = 5) -> None:
+    """
+    Выводит результат замера холодного старта: только импорт и импорт с вызовом create_bot.
+    """
+    for i_title, i_code in (("import", IMPORT_CODE), ("import + create_bot", FACTORY_CODE)):
+        timings = startup_benchmark(module, runs, i_code)
+        print("Холодный старт {module} ({title}), запусков: {runs}: min {min:.1f} мс, median {median:.1f} мс, "
+              "max {max:.1f} мс".format(module=module, title=i_title, runs=runs, **timings))
+
+
+if __name__ == '__main__':
+    print_import_profile()
+    print_startup_benchmark()
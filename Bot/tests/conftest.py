@@ -0,0 +1,19 @@
+import os
+import sys
+
+import pytest
+
+BOT_DIR: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROOT_DIR: str = os.path.dirname(BOT_DIR)
+for i_dir in (ROOT_DIR, BOT_DIR):
+    if i_dir not in sys.path:
+        sys.path.insert(0, i_dir)
+
+
+@pytest.fixture(autouse=True)
+def work_dir(tmp_path, monkeypatch):
+    """
+    Запускает каждый тест во временном каталоге, чтобы файлы логов не попадали в репозиторий.
+    """
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
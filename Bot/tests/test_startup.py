@@ -0,0 +1,38 @@
+import json
+import os
+import subprocess
+import sys
+
+from Bot.botrequests.hotel_class import STAR, Hotel
+
+from conftest import BOT_DIR, ROOT_DIR
+
+LAZY_MODULES = ("telebot", "requests", "decouple", "emoji")
+
+
+def test_import_main_is_lazy(tmp_path):
+    code = ("import json, sys, main, log, Bot.log; "
+            "print(json.dumps({{'modules': [name for name in {modules} if name in sys.modules], "
+            "'sinks': [log._sink_id, Bot.log._sink_id]}}))").format(modules=list(LAZY_MODULES))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join((BOT_DIR, ROOT_DIR)))
+    result = subprocess.run([sys.executable, "-c", code], cwd=str(tmp_path), env=env,
+                            capture_output=True, text=True, check=True)
+    assert json.loads(result.stdout) == {"modules": [], "sinks": [None, None]}
+    assert not (tmp_path / "logs").exists()
+
+
+def test_create_bot_registers_handlers(monkeypatch):
+    import main
+
+    monkeypatch.setattr(main, "HEADERS", {'x-rapidapi-host': "hotels4.p.rapidapi.com"})
+    bot = main.create_bot(token="123:token", key="api-key")
+    assert main.bot is bot
+    assert len(bot.message_handlers) == 5
+    assert len(bot.callback_query_handlers) == 1
+    assert main.HEADERS['x-rapidapi-key'] == "api-key"
+
+
+def test_hotel_renders_stars():
+    hotel = Hotel(all_info={"name": "Hotel", "starRating": 4, "address": {}, "landmarks": [{}]})
+    assert str(hotel).startswith("*Hotel*\n{stars}\n".format(stars=STAR * 4))
+    assert STAR * 4 == "⭐⭐⭐⭐"
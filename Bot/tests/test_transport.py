@@ -0,0 +1,196 @@
+import gzip
+import json
+import os
+import subprocess
+import sys
+import threading
+from typing import Dict, List, Tuple
+
+import pytest
+
+from Bot.botrequests.city_class import City
+from Bot.botrequests.hotel_class import Hotel
+from Bot.botrequests.transport import (Cassette, CassetteMissError, RecordingTransport, ReplayTransport,
+                                       make_transport, normalize_query)
+
+from conftest import BOT_DIR, ROOT_DIR
+
+URL_BASIC: str = "https://hotels4.p.rapidapi.com/"
+HEADERS: Dict = {
+    'X-RapidAPI-Key': "SECRET-KEY",
+    'x-rapidapi-host': "hotels4.p.rapidapi.com"
+}
+
+
+def make_hotel(number: int, distance: float, price: int) -> Dict:
+    """
+    Отель в формате ответа properties/list.
+    """
+    return {"name": "Hotel {number}".format(number=number), "starRating": 3,
+            "address": {"streetAddress": "Street {number}".format(number=number), "locality": "Rome",
+                        "countryName": "Italy"},
+            "guestReviews": {"rating": "8,5", "badgeText": "Great"},
+            "landmarks": [{"distance": "{distance} км".format(distance=str(distance).replace('.', ','))}],
+            "ratePlan": {"price": {"current": "{price} RUB".format(price=price), "exactCurrent": price}}}
+
+
+class FakeHotelsApi:
+    """
+    Подменяет API Hotels: отдает страницы properties/list и запоминает запрошенные номера страниц.
+    Страница 1 - расстояния 0,0..2,4 км, страница 2 - 2,5..4,9 км, страница 3 - 5,0..7,4 км.
+    Если задан status не из 2xx, отвечает ошибкой, как RapidAPI при превышении лимита.
+    """
+
+    def __init__(self) -> None:
+        self.pages: List[str] = []
+        self.status = 200
+
+    def fetch(self, url: str, headers: Dict, params: Dict) -> Tuple[int, Dict]:
+        if self.status != 200:
+            return self.status, {"message": "You have exceeded the rate limit per second for your plan"}
+        self.pages.append(str(params["pageNumber"]))
+        first = (int(params["pageNumber"]) - 1) * 25
+        results = [make_hotel(i_number, round(i_number * 0.1, 1), 5000 - i_number * 10)
+                   for i_number in range(first, first + 25)]
+        return self.status, {"data": {"body": {"searchResults": {"results": results}}}}
+
+
+def bestdeal_city() -> City:
+    return City(name="Rome", city_id="1234", sort_order="DISTANCE_FROM_LANDMARK", total_hotels="5",
+                min_max_price=["1000", "6000"], min_max_distance=["1", "3"])
+
+
+def test_normalize_query_ignores_dates_and_value_types():
+    first = normalize_query("get", URL_BASIC, {"pageNumber": 1, "checkIn": "2026-01-01", "query": "Rome"})
+    second = normalize_query("GET", URL_BASIC, {"query": "Rome", "pageNumber": "1", "checkOut": "2027-05-05"})
+    assert first == second
+
+
+def test_normalize_query_escapes_separators():
+    assert normalize_query("GET", URL_BASIC, {"query": "a&locale=b"}) != \
+        normalize_query("GET", URL_BASIC, {"query": "a", "locale": "b"})
+
+
+def test_record_save_load_replay(tmp_path):
+    path = str(tmp_path / "cassettes" / "hotels.json.gz")
+    url = URL_BASIC + "locations/search"
+    recording = RecordingTransport(Cassette(path), transport=FakeHotelsApi())
+    body = recording.get_json(url, HEADERS, {"query": "Rome", "pageNumber": 1, "checkIn": "2026-01-01"})
+    recording.close()
+
+    raw = gzip.decompress((tmp_path / "cassettes" / "hotels.json.gz").read_bytes()).decode("utf-8")
+    assert "SECRET-KEY" not in raw
+    assert "x-rapidapi-host" in raw
+
+    replay = make_transport("replay", path)
+    assert replay.get_json(url, {}, {"query": "Rome", "pageNumber": "1", "checkIn": "2030-12-31"}) == body
+    with pytest.raises(CassetteMissError):
+        replay.get_json(url, {}, {"query": "Paris", "pageNumber": "1"})
+
+
+def test_cassette_miss_is_key_error(tmp_path):
+    replay = ReplayTransport(Cassette(str(tmp_path / "empty.json.gz")).load())
+    with pytest.raises(KeyError):
+        bestdeal_city().search_all_id_for_name(URL_BASIC=URL_BASIC, HEADERS=HEADERS, transport=replay)
+
+
+def test_bestdeal_replay(tmp_path):
+    path = str(tmp_path / "hotels.json.gz")
+    api = FakeHotelsApi()
+    recording = RecordingTransport(Cassette(path), transport=api)
+    recorded = bestdeal_city().search_hotels(URL_BASIC=URL_BASIC, HEADERS=HEADERS, transport=recording)
+    recording.close()
+    assert api.pages == ["1", "2"]
+
+    replay = make_transport("replay", path)
+    hotels = bestdeal_city().search_hotels(URL_BASIC=URL_BASIC, HEADERS=HEADERS, transport=replay)
+    assert hotels == recorded
+    assert [i_hotel["name"] for i_hotel in hotels] == ["Hotel {number}".format(number=i_number)
+                                                      for i_number in range(30, 25, -1)]
+    assert str(Hotel(all_info=hotels[0])).startswith("*Hotel 30*\n⭐⭐⭐\n")
+
+
+def test_concurrent_record_and_save(tmp_path):
+    path = str(tmp_path / "hotels.json.gz")
+    cassette = Cassette(path)
+
+    def worker(number: int) -> None:
+        for i_page in range(50):
+            cassette.record(URL_BASIC, HEADERS, {"query": number, "pageNumber": i_page}, {"page": i_page})
+            cassette.save()
+
+    threads = [threading.Thread(target=worker, args=(i_number,)) for i_number in range(4)]
+    for i_thread in threads:
+        i_thread.start()
+    for i_thread in threads:
+        i_thread.join()
+    cassette.save()
+    assert len(Cassette(path).load()) == 200
+
+
+def test_error_responses_are_not_recorded(tmp_path):
+    path = str(tmp_path / "hotels.json.gz")
+    url = URL_BASIC + "properties/list"
+    params = {"destinationId": "1234", "pageNumber": "1"}
+    api = FakeHotelsApi()
+    recording = RecordingTransport(Cassette(path), transport=api)
+    good = recording.get_json(url, HEADERS, params)
+
+    api.status = 429
+    assert "message" in recording.get_json(url, HEADERS, params)
+    assert "message" in recording.get_json(url, HEADERS, {"destinationId": "5678", "pageNumber": "1"})
+    recording.close()
+
+    replay = make_transport("replay", path)
+    assert replay.get_json(url, {}, params) == good
+    with pytest.raises(CassetteMissError):
+        replay.get_json(url, {}, {"destinationId": "5678", "pageNumber": "1"})
+
+
+def test_interrupted_save_keeps_previous_cassette(tmp_path, monkeypatch):
+    path = str(tmp_path / "hotels.json.gz")
+    cassette = Cassette(path)
+    cassette.record(URL_BASIC, HEADERS, {"query": "Rome"}, {"page": 1})
+    cassette.save()
+
+    def broken_dump(*args, **kwargs):
+        raise KeyboardInterrupt
+
+    cassette.record(URL_BASIC, HEADERS, {"query": "Paris"}, {"page": 2})
+    monkeypatch.setattr(json, "dump", broken_dump)
+    with pytest.raises(KeyboardInterrupt):
+        cassette.save()
+    monkeypatch.undo()
+
+    assert os.listdir(str(tmp_path)) == ["hotels.json.gz"]
+    assert len(Cassette(path).load()) == 1
+
+
+def test_sigterm_saves_cassette(tmp_path):
+    path = str(tmp_path / "hotels.json.gz")
+    code = ("import os, signal; from Bot.botrequests.transport import make_transport; "
+            "transport = make_transport('record', {path!r}); "
+            "transport.cassette.record('url', {{}}, {{'query': 'Rome'}}, {{'page': 1}}); "
+            "os.kill(os.getpid(), signal.SIGTERM)").format(path=path)
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join((BOT_DIR, ROOT_DIR)))
+    result = subprocess.run([sys.executable, "-c", code], cwd=str(tmp_path), env=env)
+    assert result.returncode == 143
+    assert len(Cassette(path).load()) == 1
+
+
+def test_replay_returns_fresh_objects(tmp_path):
+    path = str(tmp_path / "hotels.json.gz")
+    city = City(name="Rome", city_id="1234", sort_order="PRICE", total_hotels="25")
+    recording = RecordingTransport(Cassette(path), transport=FakeHotelsApi())
+    recorded = city.search_hotels(URL_BASIC=URL_BASIC, HEADERS=HEADERS, transport=recording)
+    recorded[0]["name"] = "Changed while recording"
+    recorded.clear()
+    recording.close()
+
+    replay = make_transport("replay", path)
+    first = city.search_hotels(URL_BASIC=URL_BASIC, HEADERS=HEADERS, transport=replay)
+    first[0]["name"] = "Changed while replaying"
+    first.pop()
+    second = city.search_hotels(URL_BASIC=URL_BASIC, HEADERS=HEADERS, transport=replay)
+    assert len(second) == 25
+    assert second[0]["name"] == "Hotel 0"